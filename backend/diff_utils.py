@@ -1,15 +1,19 @@
+# Fields that are usually lists
+LIST_FIELDS = [
+    'verified_services', 'all_services', 'packages',
+    'upgradable_packages', 'docker', 'listening_ports',
+    'firewall_rules', 'login_history', 'filesystem',
+    'process_list', 'systemd_timers'
+]
+
+# Every field compare_forensic_data can report, and the ones with a 'changed' bucket
+DIFF_FIELDS = LIST_FIELDS + ['ssh_keys']
+CHANGED_FIELDS = ['ssh_keys']
+
 def compare_forensic_data(old_data: dict, new_data: dict) -> dict:
     diff = {}
 
-    # Fields that are usually lists
-    list_fields = [
-        'verified_services', 'all_services', 'packages',
-        'upgradable_packages', 'docker', 'listening_ports',
-        'firewall_rules', 'login_history', 'filesystem',
-        'process_list', 'systemd_timers'
-    ]
-
-    for field in list_fields:
+    for field in LIST_FIELDS:
         old_list = old_data.get(field, [])
         new_list = new_data.get(field, [])
 
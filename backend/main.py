@@ -1,12 +1,12 @@
-from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import func, String
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
-import models, schemas, auth, database, security, ansible_runner, diff_utils
+import models, schemas, auth, database, security, ansible_runner, diff_utils, watch_rules
 from database import engine
 
 models.Base.metadata.create_all(bind=engine)
@@ -208,6 +208,62 @@ def search_inventory(q: str, db: Session = Depends(database.get_db), current_use
 
     return results
 
+@app.get("/watch-rules", response_model=List[schemas.WatchRule])
+def get_watch_rules(db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    return db.query(models.WatchRule).order_by(models.WatchRule.id).all()
+
+@app.post("/watch-rules", response_model=schemas.WatchRule)
+def create_watch_rule(rule: schemas.WatchRuleCreate, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    db_rule = models.WatchRule(**rule.dict())
+    db.add(db_rule)
+    db.commit()
+    db.refresh(db_rule)
+    watch_rules.invalidate()
+    return db_rule
+
+@app.put("/watch-rules/{rule_id}", response_model=schemas.WatchRule)
+def update_watch_rule(rule_id: int, rule: schemas.WatchRuleCreate, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    db_rule = db.query(models.WatchRule).filter(models.WatchRule.id == rule_id).first()
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Watch rule not found")
+    for key, value in rule.dict().items():
+        setattr(db_rule, key, value)
+    db.commit()
+    db.refresh(db_rule)
+    watch_rules.invalidate()
+    return db_rule
+
+@app.delete("/watch-rules/{rule_id}")
+def delete_watch_rule(rule_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    db_rule = db.query(models.WatchRule).filter(models.WatchRule.id == rule_id).first()
+    if not db_rule:
+        raise HTTPException(status_code=404, detail="Watch rule not found")
+    # Keep past alerts, they still carry the rule name
+    db.query(models.Alert).filter(models.Alert.rule_id == rule_id).update({"rule_id": None})
+    db.delete(db_rule)
+    db.commit()
+    watch_rules.invalidate()
+    return {"message": "Watch rule deleted"}
+
+@app.get("/alerts", response_model=List[schemas.Alert])
+def get_alerts(host_id: Optional[int] = None, unacknowledged: bool = False, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    query = db.query(models.Alert)
+    if host_id is not None:
+        query = query.filter(models.Alert.host_id == host_id)
+    if unacknowledged:
+        query = query.filter(models.Alert.acknowledged == False)
+    return query.order_by(models.Alert.id.desc()).limit(limit).all()
+
+@app.post("/alerts/{alert_id}/ack", response_model=schemas.Alert)
+def acknowledge_alert(alert_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+    alert = db.query(models.Alert).filter(models.Alert.id == alert_id).first()
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    alert.acknowledged = True
+    db.commit()
+    db.refresh(alert)
+    return alert
+
 @app.get("/", tags=["Health"])
 def health_check():
     return {"status": "online", "message": "NFI API is running"}
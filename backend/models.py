@@ -23,6 +23,7 @@ class Host(Base):
     ssh_key = Column(String, nullable=True)     # Should be encrypted in a real app
 
     scans = relationship("ScanResult", back_populates="host")
+    alerts = relationship("Alert", back_populates="host", cascade="all, delete-orphan")
 
 class ScanResult(Base):
     __tablename__ = "scan_results"
@@ -36,5 +37,34 @@ class ScanResult(Base):
 
     host = relationship("Host", back_populates="scans")
 
+class WatchRule(Base):
+    __tablename__ = "watch_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String)
+    field = Column(String, index=True)       # e.g. 'ssh_keys', 'listening_ports', 'packages'
+    change = Column(String, default="added") # 'added', 'removed', 'changed', 'any'
+    match_type = Column(String, default="any") # 'any', 'equals', 'contains', 'regex'
+    pattern = Column(String, nullable=True)
+    enabled = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class Alert(Base):
+    __tablename__ = "alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rule_id = Column(Integer, ForeignKey("watch_rules.id", ondelete="SET NULL"), nullable=True, index=True)
+    rule_name = Column(String) # Kept so alerts stay readable after the rule is deleted
+    host_id = Column(Integer, ForeignKey("hosts.id", ondelete="CASCADE"), index=True)
+    scan_id = Column(Integer, ForeignKey("scan_results.id", ondelete="CASCADE"))
+    field = Column(String)
+    change = Column(String)
+    value = Column(String)
+    acknowledged = Column(Boolean, default=False)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+    host = relationship("Host", back_populates="alerts")
+
 # Index for searching JSON data (Postgres only)
 Index('ix_scan_results_data_gin', ScanResult.data, postgresql_using='gin')
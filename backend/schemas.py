@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Any
 from datetime import datetime
 import re
+import diff_utils
 
 class UserBase(BaseModel):
     username: str
@@ -61,6 +62,75 @@ class SearchResult(BaseModel):
     match_type: str # 'host' or 'data'
     snippet: Optional[str] = None
 
+WATCH_CHANGES = ('added', 'removed', 'changed', 'any')
+WATCH_MATCH_TYPES = ('any', 'equals', 'contains', 'regex')
+
+class WatchRuleBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    field: str = Field(..., min_length=1)
+    change: str = 'added'
+    match_type: str = 'any'
+    pattern: Optional[str] = None
+    enabled: bool = True
+
+    @validator('field')
+    def validate_field(cls, v):
+        if v not in diff_utils.DIFF_FIELDS:
+            raise ValueError(f"Must be one of: {', '.join(diff_utils.DIFF_FIELDS)}")
+        return v
+
+    @validator('change')
+    def validate_change(cls, v, values):
+        if v not in WATCH_CHANGES:
+            raise ValueError(f"Must be one of: {', '.join(WATCH_CHANGES)}")
+        field = values.get('field')
+        if v == 'changed' and field and field not in diff_utils.CHANGED_FIELDS:
+            raise ValueError(f"'changed' is only reported for: {', '.join(diff_utils.CHANGED_FIELDS)}")
+        return v
+
+    @validator('match_type')
+    def validate_match_type(cls, v):
+        if v not in WATCH_MATCH_TYPES:
+            raise ValueError(f"Must be one of: {', '.join(WATCH_MATCH_TYPES)}")
+        return v
+
+    @validator('pattern', always=True)
+    def validate_pattern(cls, v, values):
+        match_type = values.get('match_type')
+        if match_type and match_type != 'any' and not v:
+            raise ValueError('A pattern is required for this match type')
+        if match_type == 'regex':
+            try:
+                re.compile(v)
+            except re.error as e:
+                raise ValueError(f'Invalid regex: {e}')
+        return v
+
+class WatchRuleCreate(WatchRuleBase):
+    pass
+
+class WatchRule(WatchRuleBase):
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class Alert(BaseModel):
+    id: int
+    rule_id: Optional[int] = None
+    rule_name: str
+    host: Host
+    scan_id: int
+    field: str
+    change: str
+    value: str
+    acknowledged: bool
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
 class ScanResultBase(BaseModel):
     host_id: int
     data: Any
@@ -0,0 +1,125 @@
+import os
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models, schemas, watch_rules
+from webhook_sink import AlertSinkServer
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def enable_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    watch_rules.invalidate()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def sink(monkeypatch):
+    server = AlertSinkServer(("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(watch_rules, "WEBHOOK_URL", f"http://127.0.0.1:{server.server_port}/")
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def add_rule(db, **kwargs):
+    rule = models.WatchRule(**schemas.WatchRuleCreate(**kwargs).dict())
+    db.add(rule)
+    db.commit()
+    return rule
+
+
+def add_scan(db, host, data):
+    scan = models.ScanResult(host_id=host.id, status="success", data=data)
+    db.add(scan)
+    db.commit()
+    return scan
+
+
+def test_process_scan_alerts_on_delta_and_posts_webhook(db, sink):
+    host = models.Host(hostname="web01", ip_address="10.0.0.1", ssh_user="admin")
+    db.add(host)
+    db.commit()
+
+    add_rule(db, name="New SSH key", field="ssh_keys")
+    add_rule(db, name="Telnet opened", field="listening_ports", match_type="regex", pattern=r":23\b")
+    add_rule(db, name="Netcat", field="packages", change="any", match_type="equals", pattern="netcat")
+
+    first = add_scan(db, host, {
+        "packages": ["openssh-server"],
+        "listening_ports": ["0.0.0.0:22"],
+        "ssh_keys": []
+    })
+    # First scan is the baseline: nothing to compare against, nothing sent
+    assert watch_rules.process_scan(db, first) == []
+    assert db.query(models.Alert).count() == 0
+    assert sink.received == []
+
+    second = add_scan(db, host, {
+        "packages": ["openssh-server", "netcat"],
+        "listening_ports": ["0.0.0.0:22", "0.0.0.0:23", "0.0.0.0:2323"],
+        "ssh_keys": [{"user": "root", "key": "ssh-ed25519 AAAA"}]
+    })
+    watch_rules.process_scan(db, second)
+
+    expected = {
+        ("New SSH key", "ssh_keys", "added", "root"),
+        ("Telnet opened", "listening_ports", "added", "0.0.0.0:23"),
+        ("Netcat", "packages", "added", "netcat"),
+    }
+    alerts = db.query(models.Alert).all()
+    assert {(a.rule_name, a.field, a.change, a.value) for a in alerts} == expected
+    assert all(a.host_id == host.id and a.scan_id == second.id for a in alerts)
+
+    assert len(sink.received) == 1
+    posted = sink.received[0]["alerts"]
+    assert {(a["rule_name"], a["field"], a["change"], a["value"]) for a in posted} == expected
+    assert {a["id"] for a in posted} == {a.id for a in alerts}
+
+
+def test_deleting_host_removes_its_alerts(db):
+    host = models.Host(hostname="web01", ip_address="10.0.0.1", ssh_user="admin")
+    db.add(host)
+    db.commit()
+    add_rule(db, name="New SSH key", field="ssh_keys")
+
+    add_scan(db, host, {"ssh_keys": []})
+    scan = add_scan(db, host, {"ssh_keys": [{"user": "root", "key": "ssh-ed25519 AAAA"}]})
+    assert len(watch_rules.process_scan(db, scan)) == 1
+
+    db.delete(host)
+    db.commit()
+    assert db.query(models.Alert).count() == 0
+
+
+@pytest.mark.parametrize("rule", [
+    {"name": "Unknown field", "field": "users"},
+    {"name": "Packages never change", "field": "packages", "change": "changed"},
+    {"name": "Bad regex", "field": "packages", "match_type": "regex", "pattern": "("},
+    {"name": "Missing pattern", "field": "packages", "match_type": "equals"},
+])
+def test_rules_that_can_never_fire_are_rejected(rule):
+    with pytest.raises(ValidationError):
+        schemas.WatchRuleCreate(**rule)
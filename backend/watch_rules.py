@@ -0,0 +1,175 @@
+import os
+import re
+import json
+import logging
+import threading
+import urllib.request
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import models, diff_utils
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_URL = os.getenv("WATCH_WEBHOOK_URL")
+WEBHOOK_TIMEOUT = 5
+
+# Change kinds reported by diff_utils.compare_forensic_data
+CHANGE_KINDS = ('added', 'removed', 'changed')
+
+
+class CompiledRule:
+    def __init__(self, rule: models.WatchRule):
+        self.id = rule.id
+        self.name = rule.name
+        self.field = rule.field
+        self.change = rule.change
+        self.match_type = rule.match_type
+        self.pattern = rule.pattern
+
+        if self.match_type == 'contains':
+            self._needle = (self.pattern or '').lower()
+        elif self.match_type == 'regex':
+            self._regex = re.compile(self.pattern or '')
+
+    def matches(self, value: str) -> bool:
+        if self.match_type == 'contains':
+            return self._needle in value.lower()
+        if self.match_type == 'regex':
+            return self._regex.search(value) is not None
+        return True
+
+
+class RuleIndex:
+    """Enabled rules compiled once and bucketed by (field, change).
+
+    'equals' rules are keyed by their pattern so they cost a dict lookup per
+    changed value; everything else is scanned only for the field that changed.
+    """
+
+    def __init__(self, rules):
+        self.exact = {}
+        self.scan = {}
+        for rule in rules:
+            compiled = CompiledRule(rule)
+            changes = CHANGE_KINDS if compiled.change == 'any' else (compiled.change,)
+            for change in changes:
+                key = (compiled.field, change)
+                if compiled.match_type == 'equals':
+                    self.exact.setdefault(key, {}).setdefault(compiled.pattern, []).append(compiled)
+                else:
+                    self.scan.setdefault(key, []).append(compiled)
+        self.fields = frozenset(field for field, _ in list(self.exact) + list(self.scan))
+
+    def evaluate(self, diff: dict):
+        """Yield (rule, field, change, value) for every rule hit in a scan diff."""
+        for field in self.fields & diff.keys():
+            for change, values in diff[field].items():
+                key = (field, change)
+                exact = self.exact.get(key, {})
+                scan = self.scan.get(key, [])
+                if not exact and not scan:
+                    continue
+                for value in values:
+                    value = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+                    for rule in exact.get(value, []):
+                        yield rule, field, change, value
+                    for rule in scan:
+                        if rule.matches(value):
+                            yield rule, field, change, value
+
+
+_cache_lock = threading.Lock()
+_cache = {"signature": None, "index": None}
+
+
+def invalidate():
+    with _cache_lock:
+        _cache["signature"] = None
+        _cache["index"] = None
+
+
+def get_rule_index(db: Session) -> RuleIndex:
+    # A single aggregate query tells us whether rules changed since the last
+    # compile, so unchanged rule sets are never re-read or re-compiled.
+    signature = tuple(db.query(
+        func.count(models.WatchRule.id),
+        func.max(models.WatchRule.id),
+        func.max(models.WatchRule.updated_at)
+    ).one())
+
+    with _cache_lock:
+        if _cache["index"] is None or _cache["signature"] != signature:
+            rules = db.query(models.WatchRule).filter(models.WatchRule.enabled == True).all()
+            _cache["index"] = RuleIndex(rules)
+            _cache["signature"] = signature
+        return _cache["index"]
+
+
+def send_webhook(alerts):
+    if not WEBHOOK_URL or not alerts:
+        return
+
+    payload = json.dumps({"alerts": [
+        {
+            "id": a.id,
+            "rule_id": a.rule_id,
+            "rule_name": a.rule_name,
+            "host_id": a.host_id,
+            "scan_id": a.scan_id,
+            "field": a.field,
+            "change": a.change,
+            "value": a.value,
+        } for a in alerts
+    ]}).encode()
+
+    request = urllib.request.Request(
+        WEBHOOK_URL,
+        data=payload,
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=WEBHOOK_TIMEOUT):
+            pass
+    except Exception as e:
+        # Alerts are already stored; a dead sink must not fail the scan
+        logger.warning(f"Failed to deliver alerts to webhook: {e}")
+
+
+def process_scan(db: Session, scan_result: models.ScanResult):
+    """Evaluate watch rules against the delta between this scan and the previous successful one."""
+    previous_scan = db.query(models.ScanResult).filter(
+        models.ScanResult.host_id == scan_result.host_id,
+        models.ScanResult.id < scan_result.id,
+        models.ScanResult.status == "success"
+    ).order_by(models.ScanResult.id.desc()).first()
+
+    # The first scan of a host is the baseline, there is no delta to watch yet
+    if not previous_scan:
+        return []
+
+    index = get_rule_index(db)
+    if not index.fields:
+        return []
+
+    diff = diff_utils.compare_forensic_data(previous_scan.data, scan_result.data)
+
+    alerts = []
+    for rule, field, change, value in index.evaluate(diff):
+        alerts.append(models.Alert(
+            rule_id=rule.id,
+            rule_name=rule.name,
+            host_id=scan_result.host_id,
+            scan_id=scan_result.id,
+            field=field,
+            change=change,
+            value=value
+        ))
+
+    if alerts:
+        db.add_all(alerts)
+        db.commit()
+        send_webhook(alerts)
+
+    return alerts
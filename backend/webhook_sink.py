@@ -0,0 +1,42 @@
+import sys
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Minimal local stand-in for an alert webhook receiver.
+# Point WATCH_WEBHOOK_URL at it (e.g. http://localhost:9000/) and every batch
+# of watch rule alerts is printed to stdout.
+
+class AlertSinkServer(HTTPServer):
+    def __init__(self, address):
+        super().__init__(address, AlertSinkHandler)
+        self.received = []
+
+class AlertSinkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        self.server.received.append(payload)
+        for alert in payload.get("alerts", []):
+            print(f"[host {alert['host_id']} / scan {alert['scan_id']}] "
+                  f"{alert['rule_name']}: {alert['field']} {alert['change']} {alert['value']}", flush=True)
+
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    print(f"Listening for alerts on http://localhost:{port}/")
+    try:
+        AlertSinkServer(("127.0.0.1", port)).serve_forever()
+    except KeyboardInterrupt:
+        pass